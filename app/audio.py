@@ -3,7 +3,9 @@ import subprocess
 
 def normalize_wav(src: Path, dst: Path) -> Path:
     dst.parent.mkdir(parents=True, exist_ok=True)
-    # mono, 16 kHz, 16-bit PCM
-    cmd = ["ffmpeg", "-y", "-i", str(src), "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", str(dst)]
+    # mono, 16 kHz, 16-bit PCM; written to a .part file and renamed so `dst` is never half-written
+    part = dst.with_name(f"{dst.stem}.part{dst.suffix}")
+    cmd = ["ffmpeg", "-y", "-i", str(src), "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", str(part)]
     subprocess.run(cmd, check=True, capture_output=True)
+    part.replace(dst)
     return dst
\ No newline at end of file
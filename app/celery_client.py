@@ -1,19 +1,33 @@
 # app/celery_client.py
-from celery import Celery
+import threading
 from app.settings import settings
 
-celery_app = Celery(
-    "whisperx-transcription",
-    broker=str(settings.CELERY_BROKER_URL),
-    backend=str(settings.CELERY_RESULT_BACKEND),
-)
+# Built on first use (FastAPI dependency), so importing the API doesn't pull in Celery
+_celery_app = None
+_celery_app_lock = threading.Lock()
 
-# Client-side config (no need to include tasks in the API)
-celery_app.conf.update(
-    task_track_started=True,
-    broker_connection_retry_on_startup=True,
-    result_expires=3600,
-    worker_prefetch_multiplier=1,
-    timezone="UTC",
-    enable_utc=True,
-)
\ No newline at end of file
+def get_celery_app():
+    global _celery_app
+    if _celery_app is None:
+        with _celery_app_lock:
+            if _celery_app is None:
+                from celery import Celery
+
+                app = Celery(
+                    "whisperx-transcription",
+                    broker=str(settings.CELERY_BROKER_URL),
+                    backend=str(settings.CELERY_RESULT_BACKEND),
+                )
+
+                # Client-side config (no need to include tasks in the API)
+                app.conf.update(
+                    task_track_started=True,
+                    broker_connection_retry_on_startup=True,
+                    result_expires=3600,
+                    worker_prefetch_multiplier=1,
+                    timezone="UTC",
+                    enable_utc=True,
+                )
+                # publish only once fully configured
+                _celery_app = app
+    return _celery_app
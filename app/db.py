@@ -1,6 +1,7 @@
 # app/db.py
+import threading
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 from sqlalchemy.engine import URL
 from sqlalchemy.pool import NullPool
 from app.settings import settings
@@ -39,5 +40,23 @@ def _make_engine():
             connect_args={"connection_timeout": 10}  # fast fail
         )
 
-engine = _make_engine()
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Created on first use, not at import: keeps API cold start free of the DB driver
+# import and lets processes that never touch the DB skip it entirely.
+_engine = None
+_engine_lock = threading.Lock()
+_SessionFactory = sessionmaker(autoflush=False, autocommit=False, future=True)
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:  # concurrent first requests (threadpool) must share one pool
+            if _engine is None:
+                _engine = _make_engine()
+    return _engine
+
+def SessionLocal() -> Session:
+    return _SessionFactory(bind=get_engine())
+
+def dispose_engine() -> None:
+    if _engine is not None:
+        _engine.dispose()
@@ -0,0 +1,290 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+from bisect import bisect_left
+from pathlib import Path
+import hashlib
+import time
+import numpy as np
+from app.settings import settings
+
+SAMPLE_RATE = 16000  # whisperx.load_audio always resamples to 16 kHz mono
+
+# Simple single-process cache
+_embedding_inference = None
+
+
+def _load_embedding_inference():
+    global _embedding_inference
+    if _embedding_inference is None:
+        # Imported lazily: pyannote/torch are only needed when diarization is on
+        import torch
+        from pyannote.audio import Inference, Model
+
+        print(f"[diarization] Loading embedding model={settings.DIARIZATION_EMBEDDING_MODEL} device={settings.WHISPERX_DEVICE}")
+        model = Model.from_pretrained(
+            settings.DIARIZATION_EMBEDDING_MODEL, use_auth_token=settings.HUGGINGFACE_TOKEN
+        )
+        _embedding_inference = Inference(model, window="whole")
+        _embedding_inference.to(torch.device(settings.WHISPERX_DEVICE or "cpu"))
+    return _embedding_inference
+
+
+# ---------------------------------------------------------------------------
+# Speech windows
+# ---------------------------------------------------------------------------
+
+def speech_windows(segments: List[Dict[str, Any]]) -> List[Tuple[float, float]]:
+    """
+    Split speech regions into fixed-size windows for embedding.
+
+    The ASR segments come out of whisperx's VAD stage, so only speech is
+    embedded; silence and music between segments never reach the model.
+    """
+    window = settings.DIARIZATION_WINDOW_SEC
+    min_len = settings.DIARIZATION_MIN_WINDOW_SEC
+    out: List[Tuple[float, float]] = []
+    for seg in segments:
+        start, end = float(seg["start"]), float(seg["end"])
+        t = start
+        while end - t >= min_len:
+            w_end = min(t + window, end)
+            # fold a short tail into the previous window instead of embedding it alone
+            if end - w_end < min_len:
+                w_end = end
+            out.append((t, w_end))
+            t = w_end
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Embedding cache (per audio hash)
+# ---------------------------------------------------------------------------
+
+def audio_hash(audio: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(audio).tobytes()).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return Path(settings.DIARIZATION_CACHE_DIR) / f"{key}.npz"
+
+
+def _cache_key(audio_digest: str, windows: List[Tuple[float, float]]) -> str:
+    h = hashlib.sha256()
+    h.update(audio_digest.encode())
+    h.update(settings.DIARIZATION_EMBEDDING_MODEL.encode())
+    h.update(np.asarray(windows, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def compute_embeddings(audio: np.ndarray, windows: List[Tuple[float, float]]) -> np.ndarray:
+    """
+    Return one L2-normalised embedding per window, reusing cached embeddings
+    when the same audio (and the same windows) was diarized before.
+    """
+    if not windows:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    path = _cache_path(_cache_key(audio_hash(audio), windows))
+    if path.exists():
+        try:
+            with np.load(path) as cached:
+                embeddings = cached["embeddings"]
+            path.touch()  # cache eviction is by mtime; keep recently used entries
+            return embeddings
+        except Exception:
+            pass  # corrupt/partial cache entry; recompute below
+
+    import torch
+    from pyannote.core import Segment
+
+    inference = _load_embedding_inference()
+    waveform = {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE}
+    duration = len(audio) / SAMPLE_RATE
+
+    embeddings = []
+    for start, end in windows:
+        emb = inference.crop(waveform, Segment(start, min(end, duration)))
+        embeddings.append(np.asarray(emb, dtype=np.float32).reshape(-1))
+    matrix = np.vstack(embeddings)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.maximum(norms, 1e-8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp.npz")
+    np.savez(tmp, embeddings=matrix)
+    tmp.replace(path)
+    try:
+        # Evict on the host that writes the cache, right when it grows
+        evict_cache(path.parent)
+    except Exception as e:
+        print(f"[diarization] cache eviction failed: {e}")
+    return matrix
+
+
+def evict_cache(cache_dir: Path | None = None) -> int:
+    """
+    Evict embedding cache entries unused for DIARIZATION_CACHE_MAX_AGE_SEC
+    (hits refresh mtime), then the least recently used ones until the cache fits
+    in DIARIZATION_CACHE_MAX_BYTES. Returns the number of files removed.
+    """
+    cache_dir = cache_dir or Path(settings.DIARIZATION_CACHE_DIR)
+    if not cache_dir.exists():
+        return 0
+    cutoff = time.time() - settings.DIARIZATION_CACHE_MAX_AGE_SEC
+    entries = []
+    for p in cache_dir.iterdir():
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue  # removed concurrently by another worker on this host
+        if p.is_file():
+            entries.append((st.st_mtime, st.st_size, p))
+    entries.sort()  # oldest first
+
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, p in entries:
+        if mtime >= cutoff and total <= settings.DIARIZATION_CACHE_MAX_BYTES:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Incremental clustering
+# ---------------------------------------------------------------------------
+
+def cluster_embeddings(embeddings: np.ndarray) -> List[int]:
+    """
+    Online centroid clustering: each window joins the most similar speaker
+    if cosine similarity clears the threshold, otherwise it opens a new one
+    (until DIARIZATION_MAX_SPEAKERS is reached). Centroids are running means,
+    so speakers found in early chunks are reused for later ones.
+    """
+    threshold = settings.DIARIZATION_SIMILARITY_THRESHOLD
+    max_speakers = settings.DIARIZATION_MAX_SPEAKERS
+
+    centroids: List[np.ndarray] = []
+    counts: List[int] = []
+    labels: List[int] = []
+    for emb in embeddings:
+        if centroids:
+            sims = np.stack(centroids) @ emb
+            best = int(np.argmax(sims))
+            if sims[best] >= threshold or len(centroids) >= max_speakers:
+                counts[best] += 1
+                c = centroids[best] + (emb - centroids[best]) / counts[best]
+                centroids[best] = c / max(float(np.linalg.norm(c)), 1e-8)
+                labels.append(best)
+                continue
+        centroids.append(emb.copy())
+        counts.append(1)
+        labels.append(len(centroids) - 1)
+    return labels
+
+
+def windows_to_turns(windows: List[Tuple[float, float]], labels: List[int]) -> List[Dict[str, Any]]:
+    """Merge consecutive windows of the same speaker into turns."""
+    turns: List[Dict[str, Any]] = []
+    for (start, end), label in zip(windows, labels):
+        speaker = f"SPEAKER_{label:02d}"
+        if turns and turns[-1]["speaker"] == speaker and start - turns[-1]["end"] <= settings.DIARIZATION_MERGE_GAP_SEC:
+            turns[-1]["end"] = end
+        else:
+            turns.append({"start": start, "end": end, "speaker": speaker})
+    return turns
+
+
+def diarize_embeddings(audio: np.ndarray, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    windows = speech_windows(segments)
+    if not windows:
+        return []
+    embeddings = compute_embeddings(audio, windows)
+    labels = cluster_embeddings(embeddings)
+    return windows_to_turns(windows, labels)
+
+
+# ---------------------------------------------------------------------------
+# Word -> speaker assignment
+# ---------------------------------------------------------------------------
+
+class TurnIndex:
+    """
+    Sorted interval index over speaker turns.
+
+    Lookups bisect on turn starts and walk back only while a prefix-max of
+    turn ends says an overlap is still possible, so assigning N words to
+    M turns is ~O(N log M) instead of the O(N * M) scan whisperx does.
+    """
+
+    def __init__(self, turns: List[Dict[str, Any]]):
+        ordered = sorted(turns, key=lambda t: (t["start"], t["end"]))
+        self.starts = [float(t["start"]) for t in ordered]
+        self.ends = [float(t["end"]) for t in ordered]
+        self.speakers = [t["speaker"] for t in ordered]
+        # prefix max of ends, and the index of the turn that reaches it
+        self.max_end: List[float] = []
+        self.max_end_idx: List[int] = []
+        running, running_idx = float("-inf"), -1
+        for i, e in enumerate(self.ends):
+            if e > running:
+                running, running_idx = e, i
+            self.max_end.append(running)
+            self.max_end_idx.append(running_idx)
+
+    def speaker_for(self, start: float, end: float) -> str | None:
+        """Speaker with the largest overlap with [start, end]; nearest turn if none overlaps."""
+        if not self.starts:
+            return None
+        overlap: Dict[str, float] = {}
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            ov = min(end, self.ends[i]) - max(start, self.starts[i])
+            if ov > 0:
+                overlap[self.speakers[i]] = overlap.get(self.speakers[i], 0.0) + ov
+            i -= 1
+        if overlap:
+            return max(overlap, key=overlap.get)
+        return self._nearest(start, end)
+
+    def _nearest(self, start: float, end: float) -> str | None:
+        mid = (start + end) / 2
+        j = bisect_left(self.starts, mid)
+        # Left of mid the closest turn is the one ending latest (not necessarily
+        # the one starting latest); right of mid it is the first to start.
+        candidates = [j]
+        if j > 0:
+            candidates.append(self.max_end_idx[j - 1])
+        best, best_dist = None, float("inf")
+        for k in candidates:
+            if 0 <= k < len(self.starts):
+                dist = max(self.starts[k] - mid, mid - self.ends[k], 0.0)
+                if dist < best_dist:
+                    best, best_dist = self.speakers[k], dist
+        return best
+
+
+def assign_word_speakers(turns: List[Dict[str, Any]], aligned: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop-in replacement for whisperx.assign_word_speakers backed by TurnIndex."""
+    index = TurnIndex(turns)
+    for seg in aligned.get("segments", []):
+        seg_speaker = index.speaker_for(float(seg["start"]), float(seg["end"]))
+        if seg_speaker is not None:
+            seg["speaker"] = seg_speaker
+        for w in seg.get("words", []) or []:
+            if w.get("start") is None or w.get("end") is None:
+                continue
+            speaker = index.speaker_for(float(w["start"]), float(w["end"]))
+            if speaker is not None:
+                w["speaker"] = speaker
+    return aligned
+
+
+def turns_from_dataframe(diar_df) -> List[Dict[str, Any]]:
+    """Convert whisperx.DiarizationPipeline output (pandas DataFrame) to turns."""
+    return [
+        {"start": float(row.start), "end": float(row.end), "speaker": row.speaker}
+        for row in diar_df.itertuples(index=False)
+    ]
@@ -14,9 +14,12 @@ def download_to_tmp(url: str, job_id: str, tmp_dir: Path = Path("data/tmp")) ->
     _check_allowlist(url)
     tmp_dir.mkdir(parents=True, exist_ok=True)
     target = tmp_dir / f"{job_id}"
+    # write to .part and rename, so `target` only ever exists fully downloaded
+    part = tmp_dir / f"{job_id}.part"
     with httpx.stream("GET", url, timeout=60) as r:
         r.raise_for_status()
-        with open(target, "wb") as f:
+        with open(part, "wb") as f:
             for chunk in r.iter_bytes():
                 f.write(chunk)
+    part.replace(target)
     return target
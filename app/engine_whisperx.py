@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import Dict, Any, List
 from pathlib import Path
+import time
 import whisperx  # type: ignore
 from app.settings import settings
+from app import diarization
 
 from importlib.metadata import version
 import faster_whisper, ctranslate2
@@ -44,13 +46,17 @@ def _load_diarizer():
     return _diarizer
 
 def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
+    timings: Dict[str, float] = {}
+
     # 1) Load audio
     audio = whisperx.load_audio(audio_path)
 
     # 2) ASR
+    t0 = time.perf_counter()
     asr = _load_asr()
     # You can tweak batch_size; lower values reduce memory
     asr_result = asr.transcribe(audio, batch_size=8)
+    timings["asr_sec"] = time.perf_counter() - t0
     # asr_result keys: "segments" (list of dicts), "text", "language", etc.
 
     language = asr_result.get("language", None)
@@ -58,6 +64,7 @@ def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
     # 3) Optional alignment (word timestamps)
     aligned = asr_result
     if settings.WHISPERX_ENABLE_ALIGNMENT and language:
+        t0 = time.perf_counter()
         try:
             align_model, align_meta = _load_alignment(language_code=language)
             aligned = whisperx.align(
@@ -67,17 +74,25 @@ def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
         except Exception as e:
             # Fall back gracefully if alignment model fails
             aligned = asr_result
+        timings["alignment_sec"] = time.perf_counter() - t0
 
     # 4) Optional diarization
-    diar_segments = None
     if settings.WHISPERX_ENABLE_DIARIZATION:
+        t0 = time.perf_counter()
         try:
-            diarizer = _load_diarizer()
-            diar_segments = diarizer(audio)
-            aligned = whisperx.assign_word_speakers(diar_segments, aligned)
-        except Exception:
+            if settings.DIARIZATION_BACKEND == "pyannote":
+                diarizer = _load_diarizer()
+                turns = diarization.turns_from_dataframe(diarizer(audio))
+            else:
+                # Embeds only the VAD speech regions ASR already found
+                turns = diarization.diarize_embeddings(audio, aligned.get("segments", []))
+            aligned = diarization.assign_word_speakers(turns, aligned)
+        except Exception as e:
             # Ignore diarization errors for MVP
-            pass
+            print(f"[diarization] failed: {e}")
+        timings["diarization_sec"] = time.perf_counter() - t0
+
+    print("[whisperx] timings", {k: round(v, 3) for k, v in timings.items()})
 
     # 5) Convert to our contract
     out_segments: List[Dict[str, Any]] = []
@@ -89,6 +104,7 @@ def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
                 "start": float(w["start"]) if w.get("start") is not None else None,
                 "end": float(w["end"]) if w.get("end") is not None else None,
                 "confidence": float(w["score"]) if w.get("score") is not None else None,
+                "speaker": w.get("speaker"),
             })
         out_segments.append({
             "start": float(seg["start"]),
@@ -108,5 +124,7 @@ def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
             "compute_type": settings.WHISPERX_COMPUTE_TYPE,
             "alignment": bool(settings.WHISPERX_ENABLE_ALIGNMENT),
             "diarization": bool(settings.WHISPERX_ENABLE_DIARIZATION),
-        }
+            "diarization_backend": settings.DIARIZATION_BACKEND if settings.WHISPERX_ENABLE_DIARIZATION else None,
+        },
+        "timings": {k: round(v, 3) for k, v in timings.items()},
     }
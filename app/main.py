@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import Base, engine
+from app.db import Base, get_engine, dispose_engine
 from app.settings import settings
 from app.routes.transcriptions import router as transcriptions_router
 from contextlib import asynccontextmanager
@@ -8,15 +8,16 @@ from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # ----- startup -----
-    # Dev-only: create tables if they do not exist.
-    # In prod, prefer running Alembic migrations instead of create_all.
-    Base.metadata.create_all(bind=engine)
+    # Dev-only, opt-in (DB_CREATE_SCHEMA=true): create tables if they do not exist.
+    # In prod the schema comes from Alembic migrations, so boot never touches the DB.
+    if settings.DB_CREATE_SCHEMA:
+        Base.metadata.create_all(bind=get_engine())
 
     yield
 
     # ----- shutdown -----
     # Dispose pooled DB connections so the process exits cleanly
-    engine.dispose()
+    dispose_engine()
 
 app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
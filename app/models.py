@@ -1,6 +1,6 @@
 # app/models.py
 from datetime import datetime
-from sqlalchemy import String, Text, JSON, Float, Enum, text
+from sqlalchemy import String, Text, JSON, Float, Integer, Enum, ForeignKey, Index, DDL, event, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.schema import CheckConstraint
 from app.db import Base
@@ -39,6 +39,12 @@ class TranscriptionJob(Base):
     started_at: Mapped[datetime | None] = mapped_column(default=None)
     finished_at: Mapped[datetime | None] = mapped_column(default=None)
 
+    # Crash recovery: bumped periodically by the worker while a job runs;
+    # the reaper requeues/fails running jobs whose heartbeat goes stale.
+    heartbeat_at: Mapped[datetime | None] = mapped_column(default=None)
+    phase: Mapped[str | None] = mapped_column(String(32), default=None)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+
     request_metadata: Mapped[dict | None] = mapped_column(JSON, default=None)
     language: Mapped[str | None] = mapped_column(String(16), default=None)
     duration_sec: Mapped[float | None] = mapped_column(Float, default=None)
@@ -51,3 +57,46 @@ class TranscriptionJob(Base):
     user_info: Mapped[dict | None] = mapped_column(JSON, default=None)
     transcript_json: Mapped[dict | None] = mapped_column(JSON, default=None)
     result_blob_url: Mapped[str | None] = mapped_column(Text, default=None)
+
+class TranscriptSegment(Base):
+    """One searchable transcript segment; populated when a job succeeds."""
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        # MySQL: InnoDB FULLTEXT index. SQLite uses the FTS5 table created below.
+        Index("ix_transcript_segments_text_ft", "text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("transcription_jobs.job_id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    segment_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_sec: Mapped[float] = mapped_column(Float, nullable=False)
+    end_sec: Mapped[float] = mapped_column(Float, nullable=False)
+    speaker: Mapped[str | None] = mapped_column(String(32), default=None)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+
+# SQLite (local dev): external-content FTS5 index over transcript_segments.text
+# (no second copy of the text), kept in sync by triggers so deletes, including
+# ON DELETE CASCADE from transcription_jobs, also leave the index.
+SQLITE_FTS_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transcript_segments_fts USING fts5("
+    "text, content='transcript_segments', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (transcript_segments_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_au AFTER UPDATE ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (transcript_segments_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO transcript_segments_fts (rowid, text) VALUES (new.id, new.text); END",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_au",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ad",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ai",
+    "DROP TABLE IF EXISTS transcript_segments_fts",
+]
+for _stmt in SQLITE_FTS_CREATE:
+    event.listen(TranscriptSegment.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in SQLITE_FTS_DROP:
+    event.listen(TranscriptSegment.__table__, "before_drop", DDL(_stmt).execute_if(dialect="sqlite"))
@@ -1,29 +1,57 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Query
 from pydantic import BaseModel, HttpUrl
 import os
 import uuid
 from datetime import datetime
 # from worker.celery_app import celery_app
-from app.celery_client import celery_app
-from celery.result import AsyncResult
+from app.celery_client import get_celery_app
 
 from app.db import SessionLocal
 from app.models import TranscriptionJob, JobStatus
 from app.permissions import get_current_user
-from app.settings import settings
-from azure.storage.blob import BlobServiceClient
+from app.search import search_segments
+from app.storage import get_container_client
 
 router = APIRouter(tags=["transcriptions"])
 
-azure_connection_string = settings.AZURE_STORAGE_CONNECTION_STRING
-azure_container_name = settings.AZURE_CONTAINER_NAME
-
-if not azure_connection_string or not azure_container_name:
-    raise ValueError("AZURE_STORAGE_CONNECTION_STRING and AZURE_CONTAINER_NAME are not set.")
-blob_service_client = BlobServiceClient.from_connection_string(azure_connection_string)
+def _enqueue_transcription(celery_app, audio_url: str, metadata: dict, user_info: dict) -> str:
+    """
+    Insert the job row first, then enqueue under the same pre-generated id, so a
+    worker never picks up a task whose row doesn't exist yet (it could not mark
+    it running/heartbeat, and the reaper would never see it).
+    """
+    job_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(TranscriptionJob(
+            job_id=job_id,
+            audio_url=audio_url,
+            status=JobStatus.queued,
+            request_metadata=metadata,
+            user_info=user_info,
+        ))
+        db.commit()
+    try:
+        celery_app.send_task(
+            "worker.tasks.transcribe_task",
+            kwargs={"audio_url": audio_url, "metadata": metadata},
+            task_id=job_id,
+        )
+    except Exception as e:
+        with SessionLocal() as db:
+            job = db.get(TranscriptionJob, job_id)
+            job.status = JobStatus.failed
+            job.error_message = f"enqueue failed: {e}"
+            db.commit()
+        raise
+    return job_id
 
 @router.post("/uploadfile/", tags=["File Upload"])
-async def upload_file(file: UploadFile = File(...), user_info: dict = Depends(get_current_user)):
+async def upload_file(
+    file: UploadFile = File(...),
+    user_info: dict = Depends(get_current_user),
+    container_client = Depends(get_container_client),
+    celery_app = Depends(get_celery_app),
+):
     """
     This endpoint saves the file to Azure Blob Storage.
     """
@@ -32,9 +60,6 @@ async def upload_file(file: UploadFile = File(...), user_info: dict = Depends(ge
         file_extension = os.path.splitext(file.filename)[1]
         unique_filename = f"{uuid.uuid4()}{file_extension}"
 
-        # Get Container Client
-        container_client = blob_service_client.get_container_client(azure_container_name)
-        
         # Blob Client
         blob_client = container_client.get_blob_client(unique_filename)
 
@@ -47,27 +72,13 @@ async def upload_file(file: UploadFile = File(...), user_info: dict = Depends(ge
         # Get blob URL
         blob_url = blob_client.url
 
-        # Automatically create transcription job
-        async_res = celery_app.send_task(
-            "worker.tasks.transcribe_task",
-            kwargs={"audio_url": blob_url, "metadata": {"original_filename": file.filename}},
-        )
-
-        # Save job to database
-        with SessionLocal() as db:
-            db.add(TranscriptionJob(
-                job_id=async_res.id,
-                audio_url=blob_url,
-                status=JobStatus.queued,
-                request_metadata={"original_filename": file.filename},
-                user_info=user_info,
-            ))
-            db.commit()
+        # Automatically create transcription job (DB row + task)
+        job_id = _enqueue_transcription(celery_app, blob_url, {"original_filename": file.filename}, user_info)
 
         return {
             "message": f"'{file.filename}' uploaded and transcription job started successfully.",
             "url": blob_url,
-            "job_id": async_res.id,
+            "job_id": job_id,
             "status": "queued"
         }
     
@@ -80,25 +91,38 @@ class TranscriptionRequest(BaseModel):
     metadata: dict | None = None
 
 @router.post("/transcriptions")
-def create_transcription(req: TranscriptionRequest, user_info: dict = Depends(get_current_user)):
+def create_transcription(req: TranscriptionRequest, user_info: dict = Depends(get_current_user), celery_app = Depends(get_celery_app)):
     """
-    MVP: enqueue a job and return Celery task_id as job_id.
+    MVP: enqueue a job and return its job_id (also the Celery task_id).
     (Auth, SSRF allowlist, and idempotency will come next.)
     """
-    async_res = celery_app.send_task(
-        "worker.tasks.transcribe_task",
-        kwargs={"audio_url": str(req.audio_url), "metadata": req.metadata or {}},
-    )
+    job_id = _enqueue_transcription(celery_app, str(req.audio_url), req.metadata or {}, user_info)
+    return {"job_id": job_id, "status": "queued"}
+
+class SearchHit(BaseModel):
+    job_id: str
+    segment_index: int
+    start: float
+    end: float
+    speaker: str | None = None
+    text: str
+    score: float
+
+# declared before /transcriptions/{job_id} so "search" isn't taken as a job_id
+@router.get("/transcriptions/search", response_model=list[SearchHit])
+def search_transcriptions(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    phrase: bool = False,
+    user_info: dict = Depends(get_current_user),
+):
+    """
+    Full-text search over completed transcripts; hits are ranked best first.
+    Set phrase=true to match the words of q as an exact phrase.
+    """
     with SessionLocal() as db:
-        db.add(TranscriptionJob(
-            job_id=async_res.id,
-            audio_url=str(req.audio_url),
-            status=JobStatus.queued,
-            request_metadata=req.metadata or {},
-            user_info=user_info,
-        ))
-        db.commit()
-    return {"job_id": async_res.id, "status": "queued"}
+        hits = search_segments(db, q, limit=limit, phrase=phrase)
+    return [SearchHit(job_id=h["job_id"], segment_index=h["segment_index"], start=h["start_sec"], end=h["end_sec"], speaker=h["speaker"], text=h["text"], score=float(h["score"] or 0.0)) for h in hits]
 
 class JobStatusResponse(BaseModel):
     job_id: str
@@ -110,10 +134,14 @@ class JobStatusResponse(BaseModel):
 def get_transcription_status(job_id: str, user_info: dict = Depends(get_current_user)):
     with SessionLocal() as db:
         job = db.query(TranscriptionJob).filter(TranscriptionJob.job_id == job_id).first()
-        if job and job.status in [JobStatus.canceled, JobStatus.failed, JobStatus.succeeded]:
+        # The worker keeps the row current (claim, heartbeat, reaper requeue), so it is
+        # authoritative; Celery's state can say FAILURE (WorkerLostError) for a job
+        # the reaper is about to requeue under the same id.
+        if job:
             return JobStatusResponse(job_id=job_id, status=job.status.value)
 
-    res = AsyncResult(job_id, app=celery_app)
+    # Legacy: jobs enqueued without a DB row (the only path that needs Celery)
+    res = get_celery_app().AsyncResult(job_id)
     state = res.state
 
     if state == "REVOKED":
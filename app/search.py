@@ -0,0 +1,151 @@
+# app/search.py
+"""
+Full-text search over completed transcripts.
+
+Segments are stored in `transcript_segments` and indexed with a MySQL
+FULLTEXT index (prod) or a trigger-synced, external-content SQLite FTS5
+table (local dev).
+
+Backfill existing jobs with:
+    python -m app.search backfill
+"""
+from __future__ import annotations
+import argparse
+import re
+from typing import Any, Dict, List
+from sqlalchemy import select, delete, text
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import TranscriptionJob, TranscriptSegment, JobStatus
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def index_transcript(db: Session, job_id: str, transcript: Dict[str, Any] | None) -> int:
+    """
+    (Re)index the segments of one transcript. Idempotent: existing rows for
+    the job are replaced. Caller commits. Returns the number of segments indexed.
+    """
+    # On SQLite the FTS5 index follows these rows via triggers (see app.models)
+    db.execute(delete(TranscriptSegment).where(TranscriptSegment.job_id == job_id))
+
+    rows = []
+    for i, seg in enumerate((transcript or {}).get("segments") or []):
+        seg_text = (seg.get("text") or "").strip()
+        if not seg_text:
+            continue
+        rows.append(TranscriptSegment(
+            job_id=job_id,
+            segment_index=i,
+            start_sec=float(seg.get("start") or 0.0),
+            end_sec=float(seg.get("end") or 0.0),
+            speaker=seg.get("speaker"),
+            text=seg_text,
+        ))
+    db.add_all(rows)
+    return len(rows)
+
+
+def index_job(job_id: str, transcript: Dict[str, Any] | None) -> int:
+    with SessionLocal() as db:
+        n = index_transcript(db, job_id, transcript)
+        db.commit()
+        return n
+
+
+def _fts5_query(q: str, phrase: bool) -> str:
+    # Quote every token so user input can't inject FTS5 operators
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return ""
+    if phrase:
+        return '"' + " ".join(tokens) + '"'
+    return " ".join(f'"{t}"' for t in tokens)
+
+
+def _mysql_boolean_query(q: str) -> str:
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return ""
+    return '"' + " ".join(tokens) + '"'
+
+
+def search_segments(db: Session, q: str, limit: int = 20, phrase: bool = False) -> List[Dict[str, Any]]:
+    """Return ranked segment hits (best first) for a free-text or exact-phrase query."""
+    if _is_sqlite(db):
+        match = _fts5_query(q, phrase)
+        if not match:
+            return []
+        sql = text(
+            "SELECT s.job_id, s.segment_index, s.start_sec, s.end_sec, s.speaker, s.text, "
+            "-bm25(transcript_segments_fts) AS score "
+            "FROM transcript_segments_fts "
+            "JOIN transcript_segments s ON s.id = transcript_segments_fts.rowid "
+            "WHERE transcript_segments_fts MATCH :q "
+            "ORDER BY bm25(transcript_segments_fts) LIMIT :limit"
+        )
+    else:
+        if phrase:
+            match = _mysql_boolean_query(q)
+            mode = "IN BOOLEAN MODE"
+        else:
+            match = q.strip()
+            mode = "IN NATURAL LANGUAGE MODE"
+        if not match:
+            return []
+        sql = text(
+            "SELECT s.job_id, s.segment_index, s.start_sec, s.end_sec, s.speaker, s.text, "
+            f"MATCH(s.text) AGAINST (:q {mode}) AS score "
+            "FROM transcript_segments s "
+            f"WHERE MATCH(s.text) AGAINST (:q {mode}) "
+            "ORDER BY score DESC LIMIT :limit"
+        )
+    rows = db.execute(sql, {"q": match, "limit": limit}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def backfill(batch_size: int = 100) -> int:
+    """Index every succeeded job's transcript_json. Safe to re-run."""
+    total_jobs = 0
+    last_id = ""
+    while True:
+        with SessionLocal() as db:
+            batch = db.execute(
+                select(TranscriptionJob.job_id, TranscriptionJob.transcript_json)
+                .where(
+                    TranscriptionJob.status == JobStatus.succeeded,
+                    TranscriptionJob.transcript_json.is_not(None),
+                    TranscriptionJob.job_id > last_id,
+                )
+                .order_by(TranscriptionJob.job_id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            for job_id, transcript in batch:
+                index_transcript(db, job_id, transcript)
+            db.commit()
+        total_jobs += len(batch)
+        last_id = batch[-1].job_id
+        print(f"[search] backfilled {total_jobs} jobs (last={last_id})")
+    return total_jobs
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.search")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bf = sub.add_parser("backfill", help="index transcript_json of existing succeeded jobs")
+    bf.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "backfill":
+        n = backfill(batch_size=args.batch_size)
+        print(f"[search] done, {n} jobs indexed")
+
+
+if __name__ == "__main__":
+    main()
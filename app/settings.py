@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     DB_SCHEMA: str = "app"
     DB_USERNAME: str = "user"
     DB_PASSWORD: str = "password"
+    # Full SQLAlchemy URL; overrides the MySQL settings above (e.g. "sqlite:///data/dev.db")
+    DB_URL: str | None = None
+    # Run Base.metadata.create_all on API startup (local dev only; prod uses Alembic)
+    DB_CREATE_SCHEMA: bool = False
 
     # WhisperX config
     WHISPERX_DEVICE: str | None = None
@@ -34,6 +38,28 @@ class Settings(BaseSettings):
     WHISPERX_ENABLE_DIARIZATION: bool = False  # pyannote is heavy; keep off for MVP
     HUGGINGFACE_TOKEN: str | None = None  
 
+    # Diarization: "embedding" (speaker embeddings on VAD speech + online clustering)
+    # or "pyannote" (full whisperx.DiarizationPipeline, slow on CPU)
+    DIARIZATION_BACKEND: str = "embedding"
+    DIARIZATION_EMBEDDING_MODEL: str = "pyannote/wespeaker-voxceleb-resnet34-LM"
+    DIARIZATION_WINDOW_SEC: float = 3.0
+    DIARIZATION_MIN_WINDOW_SEC: float = 0.5
+    DIARIZATION_MERGE_GAP_SEC: float = 0.5
+    DIARIZATION_SIMILARITY_THRESHOLD: float = 0.5  # cosine; lower -> fewer speakers
+    DIARIZATION_MAX_SPEAKERS: int = 8
+    DIARIZATION_CACHE_DIR: str = "data/cache/diarization"
+    DIARIZATION_CACHE_MAX_AGE_SEC: int = 7 * 24 * 3600       # entries unused this long are evicted
+    DIARIZATION_CACHE_MAX_BYTES: int = 2 * 1024 ** 3          # then oldest entries go until under this size
+
+    # Worker scratch space & crash recovery
+    TMP_DIR: str = "data/tmp"
+    JOB_HEARTBEAT_INTERVAL_SEC: int = 30
+    JOB_STALE_AFTER_SEC: int = 300        # running job with no heartbeat for this long is considered dead
+    JOB_MAX_ATTEMPTS: int = 3             # after this many starts a stale job is failed instead of requeued
+    REAPER_INTERVAL_SEC: int = 60
+    REAPER_QUEUE: str = "maintenance"
+    TMP_ORPHAN_MAX_AGE_SEC: int = 3600
+
     # Azure Storage
     AZURE_STORAGE_CONNECTION_STRING: str | None = None
     AZURE_CONTAINER_NAME: str | None = None
@@ -43,6 +69,8 @@ class Settings(BaseSettings):
 
     @property
     def DATABASE_URL(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return (
             f"mysql+mysqlconnector://{self.DB_USERNAME}:{self.DB_PASSWORD}"
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_SCHEMA}"
@@ -0,0 +1,29 @@
+# app/storage.py
+import threading
+from fastapi import HTTPException, status
+from app.settings import settings
+
+# Built on first use so the API starts (and serves everything but uploads)
+# without azure-storage-blob being imported or Azure credentials being set.
+_blob_service_client = None
+_blob_service_client_lock = threading.Lock()
+
+def get_blob_service_client():
+    global _blob_service_client
+    if _blob_service_client is None:
+        with _blob_service_client_lock:
+            if _blob_service_client is None:
+                if not settings.AZURE_STORAGE_CONNECTION_STRING or not settings.AZURE_CONTAINER_NAME:
+                    raise RuntimeError("AZURE_STORAGE_CONNECTION_STRING and AZURE_CONTAINER_NAME are not set.")
+                from azure.storage.blob import BlobServiceClient
+
+                _blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+    return _blob_service_client
+
+def get_container_client():
+    """FastAPI dependency; override in app.dependency_overrides to swap storage."""
+    try:
+        service = get_blob_service_client()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+    return service.get_container_client(settings.AZURE_CONTAINER_NAME)
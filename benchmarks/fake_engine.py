@@ -0,0 +1,61 @@
+"""
+Deterministic stand-in for app.engine_whisperx used by the benchmarks.
+
+Returns a transcript in the same contract as transcribe_with_whisperx,
+derived only from the audio file's bytes, after an optional fixed delay
+(FAKE_ENGINE_DELAY_SEC) that simulates model time without loading a model.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List
+import hashlib
+import time
+
+FAKE_ENGINE_DELAY_SEC = 0.0
+FAKE_ENGINE_SEGMENTS = 20
+
+_WORDS = ["hello", "refund", "order", "please", "account", "thanks", "delivery", "support", "invoice", "call"]
+
+
+def transcribe_with_whisperx(audio_path: str) -> Dict[str, Any]:
+    with open(audio_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).digest()
+    if FAKE_ENGINE_DELAY_SEC:
+        time.sleep(FAKE_ENGINE_DELAY_SEC)
+
+    segments: List[Dict[str, Any]] = []
+    t = 0.0
+    for i in range(FAKE_ENGINE_SEGMENTS):
+        b = digest[i % len(digest)]
+        n_words = 3 + b % 6
+        words = []
+        for j in range(n_words):
+            words.append({
+                "word": _WORDS[(b + j) % len(_WORDS)],
+                "start": round(t + 0.4 * j, 3),
+                "end": round(t + 0.4 * j + 0.3, 3),
+                "confidence": 0.9,
+                "speaker": f"SPEAKER_{i % 2:02d}",
+            })
+        end = round(t + 0.4 * n_words, 3)
+        segments.append({
+            "start": t,
+            "end": end,
+            "text": " ".join(w["word"] for w in words),
+            "words": words,
+            "speaker": f"SPEAKER_{i % 2:02d}",
+        })
+        t = end + 0.2
+
+    return {
+        "language": "en",
+        "duration_sec": t,
+        "segments": segments,
+        "model": {
+            "name": "whisperx-fake",
+            "device": "cpu",
+            "compute_type": "none",
+            "alignment": False,
+            "diarization": False,
+        },
+        "timings": {"asr_sec": FAKE_ENGINE_DELAY_SEC},
+    }
@@ -0,0 +1,82 @@
+"""
+Local HTTP server standing in for the external services the API and worker
+call: the main backend's /admin/user/me (auth) and Azure Blob Storage
+(audio downloads via GET, uploads via PUT).
+"""
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+BENCH_USER = {"id": 1, "email": "bench@example.com", "role": "admin"}
+
+
+def fake_wav_bytes(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    """A silent mono 16-bit PCM WAV; content only has to be stable."""
+    import struct
+    n = int(seconds * sample_rate)
+    data = b"\x00\x00" * n
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    header += b"data" + struct.pack("<I", len(data))
+    return header + data
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    blobs: dict[str, bytes] = {}
+
+    def log_message(self, format, *args):  # keep benchmark output clean
+        pass
+
+    def _send(self, code: int, body: bytes, content_type: str = "application/octet-stream") -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/admin/user/me"):
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._send(401, b'{"detail":"unauthorized"}', "application/json")
+            return self._send(200, json.dumps(BENCH_USER).encode(), "application/json")
+        body = self.blobs.get(self.path.split("?", 1)[0])
+        if body is None:
+            return self._send(404, b"")
+        return self._send(200, body, "audio/wav")
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.blobs[self.path.split("?", 1)[0]] = self.rfile.read(length)
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeServices:
+    """Context manager running the fake auth/blob server on 127.0.0.1."""
+
+    def __init__(self, audio: bytes | None = None):
+        self.audio = audio if audio is not None else fake_wav_bytes()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        _Handler.blobs = {"/bench/audio.wav": self.audio}
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def audio_url(self) -> str:
+        return f"{self.base_url}/bench/audio.wav"
+
+    def __enter__(self) -> "FakeServices":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,256 @@
+"""
+End-to-end load/throughput benchmark for the API, queue and DB writes.
+
+Everything runs in one process: uvicorn serving app.main, an in-process
+Celery worker, SQLite, a fake auth/blob HTTP server and a deterministic
+fake engine in place of transcribe_with_whisperx. The broker is kombu's
+in-memory transport unless --broker points at a (local) Redis.
+
+    python -m benchmarks.load --jobs 200 --concurrency 16 --workers 4
+    python -m benchmarks.load --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.load --compare benchmarks/baselines/local.json
+
+Reports p50/p99 latency per operation, jobs/sec and DB queries per job.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.fake_services import FakeServices
+
+TERMINAL = {"succeeded", "failed", "canceled"}
+AUTH_HEADERS = {"Authorization": "Bearer bench-token"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _configure_env(workdir: Path, svc: FakeServices, broker: str) -> None:
+    """Must run before anything under app/ or worker/ is imported (settings are read at import)."""
+    os.environ["DB_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["MAIN_BACKEND_URL"] = svc.base_url
+    os.environ["DB_CREATE_SCHEMA"] = "true"
+    if broker == "memory":
+        os.environ["CELERY_BROKER_URL"] = "memory://"
+        os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+    else:
+        os.environ["CELERY_BROKER_URL"] = broker
+        os.environ["CELERY_RESULT_BACKEND"] = broker
+
+
+def _install_fake_engine(delay: float) -> None:
+    from benchmarks import fake_engine
+    fake_engine.FAKE_ENGINE_DELAY_SEC = delay
+    sys.modules["app.engine_whisperx"] = fake_engine
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        from sqlalchemy import event
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+
+async def _run_job(client, i: int, args, audio_url: str, samples: Dict[str, List[float]], outcomes: Dict[str, int]) -> None:
+    t_job = time.perf_counter()
+
+    t0 = time.perf_counter()
+    r = await client.post("/v1/transcriptions", json={"audio_url": audio_url, "metadata": {"bench": i}}, headers=AUTH_HEADERS)
+    samples["create"].append(time.perf_counter() - t0)
+    r.raise_for_status()
+    job_id = r.json()["job_id"]
+
+    if args.list_every and i % args.list_every == 0:
+        t0 = time.perf_counter()
+        r = await client.get("/v1/transcriptions", headers=AUTH_HEADERS)
+        samples["list"].append(time.perf_counter() - t0)
+        r.raise_for_status()
+
+    deadline = t_job + args.timeout
+    status = "queued"
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        r = await client.get(f"/v1/transcriptions/{job_id}", headers=AUTH_HEADERS)
+        samples["status"].append(time.perf_counter() - t0)
+        r.raise_for_status()
+        status = r.json()["status"]
+        if status in TERMINAL:
+            break
+        await asyncio.sleep(args.poll_interval)
+    else:
+        status = "timeout"
+
+    samples["job"].append(time.perf_counter() - t_job)
+    outcomes[status] = outcomes.get(status, 0) + 1
+
+
+async def _drive(base_url: str, audio_url: str, args) -> Dict[str, Any]:
+    import httpx
+
+    samples: Dict[str, List[float]] = {"create": [], "status": [], "list": [], "job": []}
+    outcomes: Dict[str, int] = {}
+    sem = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        async def one(i: int) -> None:
+            async with sem:
+                await _run_job(client, i, args, audio_url, samples, outcomes)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.jobs)))
+        wall = time.perf_counter() - t0
+
+    return {"samples": samples, "outcomes": outcomes, "wall_sec": wall}
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="transcript-bench-"))
+    with FakeServices() as svc:
+        _configure_env(workdir, svc, args.broker)
+        _install_fake_engine(args.engine_delay)
+
+        import uvicorn
+        from celery.contrib.testing.worker import start_worker
+        from app import downloader
+        from app.db import get_engine
+        from app.main import app
+        from worker.celery_app import celery_app as worker_celery_app
+        import worker.tasks  # noqa: F401  (registers transcribe_task)
+
+        downloader.ALLOWED_HOSTS.add("127.0.0.1")
+        worker_celery_app.conf.broker_transport_options = {"polling_interval": 0.01}
+        os.chdir(workdir)  # data/tmp downloads land in the scratch dir
+        engine = get_engine()
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        server_thread = threading.Thread(target=server.run, daemon=True)
+        server_thread.start()
+        while not server.started:
+            time.sleep(0.01)
+
+        try:
+            with start_worker(worker_celery_app, pool="threads", concurrency=args.workers,
+                              perform_ping_check=False, loglevel="WARNING"):
+                counter = QueryCounter(engine)
+                result = asyncio.run(_drive(f"http://127.0.0.1:{port}", svc.audio_url, args))
+                queries = counter.count
+        finally:
+            server.should_exit = True
+            server_thread.join(timeout=10)
+
+    succeeded = result["outcomes"].get("succeeded", 0)
+    return {
+        "config": {
+            "jobs": args.jobs,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "poll_interval": args.poll_interval,
+            "list_every": args.list_every,
+            "engine_delay": args.engine_delay,
+            "broker": "memory" if args.broker == "memory" else "redis",
+        },
+        "outcomes": result["outcomes"],
+        "wall_sec": round(result["wall_sec"], 3),
+        "jobs_per_sec": round(succeeded / result["wall_sec"], 3) if result["wall_sec"] else 0.0,
+        "db_queries_total": queries,
+        "db_queries_per_job": round(queries / args.jobs, 2) if args.jobs else 0.0,
+        "latency_ms": {
+            op: {
+                "count": len(v),
+                "p50": round(percentile(v, 50) * 1000, 2),
+                "p99": round(percentile(v, 99) * 1000, 2),
+            }
+            for op, v in result["samples"].items()
+        },
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print metric deltas vs. a saved baseline; return the metrics that regressed beyond tolerance."""
+    rows = [("jobs_per_sec", report["jobs_per_sec"], baseline.get("jobs_per_sec"), True),
+            ("db_queries_per_job", report["db_queries_per_job"], baseline.get("db_queries_per_job"), False)]
+    for op, cur in report["latency_ms"].items():
+        base = baseline.get("latency_ms", {}).get(op, {})
+        for p in ("p50", "p99"):
+            rows.append((f"{op}.{p}_ms", cur[p], base.get(p), False))
+
+    regressions = []
+    print(f"{'metric':<24}{'baseline':>12}{'current':>12}{'delta':>10}")
+    for name, cur, base, higher_is_better in rows:
+        if not base:
+            print(f"{name:<24}{'-':>12}{cur:>12}{'':>10}")
+            continue
+        delta = (cur - base) / base
+        worse = -delta if higher_is_better else delta
+        flag = "  REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<24}{base:>12}{cur:>12}{delta:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent simulated clients")
+    parser.add_argument("--workers", type=int, default=4, help="celery worker threads")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--list-every", type=int, default=10, help="GET /transcriptions once every N jobs (0 = never)")
+    parser.add_argument("--engine-delay", type=float, default=0.0, help="seconds the fake engine sleeps per job")
+    parser.add_argument("--broker", default="memory", help='"memory" or a redis:// URL')
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-job timeout in seconds")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression vs. baseline")
+    args = parser.parse_args(argv)
+
+    cwd = Path.cwd()
+    report = run(args)
+    os.chdir(cwd)
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"[bench] baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("config") != report["config"]:
+            print("[bench] warning: baseline was recorded with a different config")
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
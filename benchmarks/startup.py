@@ -0,0 +1,146 @@
+"""
+API import-time and cold-start benchmark, with a budget check for CI.
+
+Each sample runs in a fresh interpreter with no Azure/DB/Redis configured:
+  import  - time to `import app.main`, plus which heavy modules it pulled in
+  startup - time from spawning uvicorn to the first 200 from /healthz
+
+    python -m benchmarks.startup                 # report
+    python -m benchmarks.startup --importtime    # also show the slow part of the import tree
+    python -m benchmarks.startup --check         # exit 1 if over budget
+
+Budgets live in benchmarks/startup_budget.json.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "startup_budget.json"
+
+_IMPORT_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t
+heavy = json.loads(sys.argv[1])
+print(json.dumps({"import_sec": elapsed, "loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def _clean_env() -> Dict[str, str]:
+    """Environment of a bare API pod: no Azure, DB or broker configured."""
+    drop = ("AZURE_", "DB_", "CELERY_", "REDIS_")
+    env = {k: v for k, v in os.environ.items() if not k.startswith(drop)}
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(heavy_modules: List[str]) -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, json.dumps(heavy_modules)],
+        cwd=REPO_ROOT, env=_clean_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(timeout: float = 30.0) -> float:
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=_clean_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}: {proc.stderr.read().decode()[-2000:]}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - t0
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"/healthz not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def slow_imports(min_ms: float, max_depth: int = 4) -> List[str]:
+    """`-X importtime` tree for `import app.main`, keeping modules with cumulative time >= min_ms."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=REPO_ROOT, env=_clean_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth and int(cumulative) >= min_ms * 1000:
+            rows.append(f"{int(cumulative) / 1000:>9.1f} ms {name.rstrip()}")
+    # importtime prints children before parents; reverse to read top-down
+    return rows[::-1]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget in startup_budget.json is exceeded")
+    parser.add_argument("--importtime", type=float, nargs="?", const=20.0, default=0.0, metavar="MIN_MS",
+                        help="also print the import tree for modules taking >= MIN_MS")
+    args = parser.parse_args(argv)
+
+    budget = json.loads(BUDGET_FILE.read_text())
+    imports = [measure_import(budget["forbidden_modules"]) for _ in range(args.runs)]
+    startups = [measure_startup() for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "import_sec": {"median": round(statistics.median(i["import_sec"] for i in imports), 3),
+                       "min": round(min(i["import_sec"] for i in imports), 3)},
+        "startup_sec": {"median": round(statistics.median(startups), 3), "min": round(min(startups), 3)},
+        "heavy_modules_loaded": sorted({m for i in imports for m in i["loaded"]}),
+    }
+    print(json.dumps(report, indent=2))
+    if args.importtime:
+        print("\n".join(slow_imports(args.importtime)))
+
+    if not args.check:
+        return 0
+    failures = []
+    if report["heavy_modules_loaded"]:
+        failures.append(f"API import pulled in heavy modules: {report['heavy_modules_loaded']}")
+    if report["import_sec"]["median"] > budget["import_sec"]:
+        failures.append(f"import_sec median {report['import_sec']['median']} > budget {budget['import_sec']}")
+    if report["startup_sec"]["median"] > budget["startup_sec"]:
+        failures.append(f"startup_sec median {report['startup_sec']['median']} > budget {budget['startup_sec']}")
+    for f in failures:
+        print(f"[budget] FAIL {f}")
+    if not failures:
+        print("[budget] ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
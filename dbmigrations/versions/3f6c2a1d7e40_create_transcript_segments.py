@@ -0,0 +1,68 @@
+"""create transcript_segments search index
+
+Revision ID: 3f6c2a1d7e40
+Revises: 9bb8f8954bcb
+Create Date: 2026-10-19 10:12:44.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a1d7e40'
+down_revision: Union[str, None] = '9bb8f8954bcb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transcript_segments_fts USING fts5("
+    "text, content='transcript_segments', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (transcript_segments_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_au AFTER UPDATE ON transcript_segments BEGIN "
+    "INSERT INTO transcript_segments_fts (transcript_segments_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO transcript_segments_fts (rowid, text) VALUES (new.id, new.text); END",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_au",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ad",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ai",
+    "DROP TABLE IF EXISTS transcript_segments_fts",
+]
+
+
+def upgrade() -> None:
+    op.create_table('transcript_segments',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_id', sa.String(length=64), nullable=False),
+    sa.Column('segment_index', sa.Integer(), nullable=False),
+    sa.Column('start_sec', sa.Float(), nullable=False),
+    sa.Column('end_sec', sa.Float(), nullable=False),
+    sa.Column('speaker', sa.String(length=32), nullable=True),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['transcription_jobs.job_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcript_segments_job_id', 'transcript_segments', ['job_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ix_transcript_segments_text_ft', 'transcript_segments', ['text'], mysql_prefix='FULLTEXT')
+    elif op.get_bind().dialect.name == 'sqlite':
+        # external-content FTS5 table synced by triggers
+        for stmt in SQLITE_FTS_CREATE:
+            op.execute(stmt)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_transcript_segments_text_ft', table_name='transcript_segments')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for stmt in SQLITE_FTS_DROP:
+            op.execute(stmt)
+    op.drop_index('ix_transcript_segments_job_id', table_name='transcript_segments')
+    op.drop_table('transcript_segments')
@@ -0,0 +1,30 @@
+"""add job heartbeat/phase/attempts columns
+
+Revision ID: a71e5c93b2d8
+Revises: 3f6c2a1d7e40
+Create Date: 2026-10-19 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71e5c93b2d8'
+down_revision: Union[str, None] = '3f6c2a1d7e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('transcription_jobs', sa.Column('phase', sa.String(length=32), nullable=True))
+    op.add_column('transcription_jobs', sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_jobs', 'attempts')
+    op.drop_column('transcription_jobs', 'phase')
+    op.drop_column('transcription_jobs', 'heartbeat_at')
@@ -16,4 +16,20 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     include=["worker.tasks"],
+    # Stale-job reaper (DB-only; host-local scratch files are swept by each
+    # transcription worker): its own queue, served by a small dedicated worker, so
+    # it runs even while every transcription worker is busy. Run exactly one beat:
+    #   celery -A worker.celery_app beat
+    #   celery -A worker.celery_app worker -Q maintenance --concurrency=1
+    task_routes={
+        "worker.tasks.reap_stale_jobs": {"queue": settings.REAPER_QUEUE},
+    },
+    beat_schedule={
+        "reap-stale-jobs": {
+            "task": "worker.tasks.reap_stale_jobs",
+            "schedule": float(settings.REAPER_INTERVAL_SEC),
+            # a missed run is superseded by the next one; don't let them pile up
+            "options": {"expires": settings.REAPER_INTERVAL_SEC},
+        },
+    },
 )
@@ -1,35 +1,82 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from celery import shared_task
+from celery.signals import worker_ready
+from celery.exceptions import Ignore
 from app.downloader import download_to_tmp
 from app.audio import normalize_wav
 from app.engine_whisperx import transcribe_with_whisperx
-from worker.tasks_helpers import update_job
+from app.settings import settings
+from worker.tasks_helpers import (
+    update_job, claim_job, JobHeartbeat, cleanup_job_files,
+    find_stale_jobs, release_stale_job, restore_stale_job, cleanup_orphan_tmp_files,
+)
 from app.models import JobStatus
+from app.search import index_job
+
+def _cleanup_local_tmp() -> None:
+    # Scratch files live in this host's TMP_DIR, so each worker sweeps its own
+    try:
+        removed = cleanup_orphan_tmp_files()
+        if removed:
+            print(f"[tmp] removed {removed} orphaned scratch files")
+    except Exception as e:
+        print(f"[tmp] cleanup failed: {e}")
+
+@worker_ready.connect
+def _on_worker_ready(**kwargs) -> None:
+    # after a crash/restart: drop what earlier attempts on this host left behind
+    _cleanup_local_tmp()
+
+def _set_phase(task, job_id: str, phase: str) -> None:
+    task.update_state(state="STARTED", meta={"phase": phase})
+    update_job(job_id, phase=phase)
 
 @shared_task(name="worker.tasks.transcribe_task", bind=True)
 def transcribe_task(self, audio_url: str, metadata: dict):
     job_id = self.request.id
 
-    # mark running
-    update_job(job_id, status=JobStatus.running, started_at=datetime.now(datetime.timezone.utc))
+    # mark running (no-op on a redelivered message for a finished job or one a live worker still owns)
+    claim = claim_job(job_id)
+    if claim == "missing":
+        # The API writes the row before enqueueing; if it isn't visible yet, wait for it
+        # rather than running a job nothing tracks (no heartbeat, invisible to the reaper)
+        raise self.retry(countdown=5, max_retries=3)
+    if claim in ("done", "busy"):
+        print(f"[transcribe] skipping {job_id}: {claim}")
+        raise Ignore()
+
+    # files of jobs that were requeued and finished elsewhere are only reachable from here
+    _cleanup_local_tmp()
+
+    tmp_dir = Path(settings.TMP_DIR)
+    src = tmp_dir / job_id
+    norm = tmp_dir / f"{job_id}.wav"
     try:
-        # 1) Download
-        self.update_state(state="STARTED", meta={"phase": "download"})
-        src = download_to_tmp(audio_url, job_id)
-        update_job(job_id, error_message=None)  # clear any stale error, optional
-
-        # 2) Normalize (optional but safer for edge formats)
-        self.update_state(state="STARTED", meta={"phase": "normalize"})
-        norm = Path("data/tmp") / f"{job_id}.wav"
-        try:
-            audio_path = normalize_wav(src, norm)
-        except Exception:
-            audio_path = src  # fallback
+        with JobHeartbeat(job_id):
+            # 1) + 2) Download & normalize, resuming from files a crashed attempt left
+            # behind (both are written atomically, so existing ones are complete)
+            if norm.exists():
+                print(f"[transcribe] {job_id}: resuming from normalized audio")
+                audio_path = norm
+            else:
+                if src.exists():
+                    print(f"[transcribe] {job_id}: resuming from downloaded audio")
+                else:
+                    _set_phase(self, job_id, "download")
+                    download_to_tmp(audio_url, job_id, tmp_dir=tmp_dir)
+                update_job(job_id, error_message=None)  # clear any stale error, optional
+
+                # Normalize (optional but safer for edge formats)
+                _set_phase(self, job_id, "normalize")
+                try:
+                    audio_path = normalize_wav(src, norm)
+                except Exception:
+                    audio_path = src  # fallback
 
-        # 3) WhisperX
-        self.update_state(state="STARTED", meta={"phase": "transcribe"})
-        result = transcribe_with_whisperx(str(audio_path))
+            # 3) WhisperX
+            _set_phase(self, job_id, "transcribe")
+            result = transcribe_with_whisperx(str(audio_path))
 
         # 4) Return contract
         result["request_metadata"] = metadata or {}
@@ -39,7 +86,8 @@ def transcribe_task(self, audio_url: str, metadata: dict):
         update_job(
             job_id,
             status=JobStatus.succeeded,
-            finished_at=datetime.now(datetime.timezone.utc),
+            phase="done",
+            finished_at=datetime.now(timezone.utc),
             language=result.get("language"),
             duration_sec=total_duration_from_segments,
             model_name=result.get("model").get("name"),
@@ -48,13 +96,53 @@ def transcribe_task(self, audio_url: str, metadata: dict):
             transcript_json=result,
             error_message=None,
         )
+        try:
+            index_job(job_id, result)
+        except Exception as e:
+            # Search is best-effort; `python -m app.search backfill` can catch up later
+            print(f"[search] indexing failed for {job_id}: {e}")
+        cleanup_job_files(job_id)
         return result
     except Exception as e:
         # failure
         update_job(
             job_id,
             status=JobStatus.failed,
-            finished_at=datetime.now(datetime.timezone.utc),
+            finished_at=datetime.now(timezone.utc),
             error_message=str(e),
         )
-        raise
\ No newline at end of file
+        cleanup_job_files(job_id)
+        raise
+
+@shared_task(name="worker.tasks.reap_stale_jobs")
+def reap_stale_jobs():
+    """
+    Periodic (Celery beat): recover jobs whose worker died mid-run.
+
+    A running job with no heartbeat for JOB_STALE_AFTER_SEC is requeued under
+    the same job_id (so the next attempt can resume from its scratch files if
+    it lands on the same host), or failed once it used up JOB_MAX_ATTEMPTS.
+    DB-only: scratch files are cleaned by the transcription workers themselves.
+    """
+    requeued, failed = [], []
+    for job in find_stale_jobs():
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            msg = f"worker lost: no heartbeat since {job.heartbeat_at or job.started_at} after {job.attempts} attempts"
+            if release_stale_job(job.job_id, JobStatus.failed, error_message=msg):
+                failed.append(job.job_id)
+        elif release_stale_job(job.job_id, JobStatus.queued):
+            try:
+                transcribe_task.apply_async(
+                    kwargs={"audio_url": job.audio_url, "metadata": job.request_metadata or {}},
+                    task_id=job.job_id,
+                )
+            except Exception as e:
+                # e.g. broker down: back to running-stale so the next sweep retries it
+                print(f"[reaper] requeue of {job.job_id} failed: {e}")
+                restore_stale_job(job.job_id, error_message=f"requeue failed: {e}")
+                continue
+            requeued.append(job.job_id)
+
+    if requeued or failed:
+        print(f"[reaper] requeued={requeued} failed={failed}")
+    return {"requeued": requeued, "failed": failed}
@@ -1,7 +1,14 @@
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, List
+import threading
+import time
+from sqlalchemy import update, select, func, or_, and_
 from app.db import SessionLocal
 from app.models import TranscriptionJob, JobStatus
+from app.settings import settings
+
+TERMINAL_STATUSES = (JobStatus.succeeded, JobStatus.failed, JobStatus.canceled)
 
 def update_job(job_id: str, **fields: Any) -> None:
     with SessionLocal() as db:
@@ -11,4 +18,168 @@ def update_job(job_id: str, **fields: Any) -> None:
         for k, v in fields.items():
             setattr(job, k, v)
         # optional: bump a last_update_at column if you have one
-        db.commit()
\ No newline at end of file
+        db.commit()
+
+def _last_seen():
+    # heartbeat_at is only set once a worker picked the job up
+    return func.coalesce(TranscriptionJob.heartbeat_at, TranscriptionJob.started_at, TranscriptionJob.enqueued_at)
+
+def _stale_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_STALE_AFTER_SEC)
+
+def claim_job(job_id: str) -> str:
+    """
+    Atomically mark a job as running for this worker.
+
+    Returns "claimed", "missing" (row not written yet by the API), "done"
+    (already terminal, e.g. a redelivered message) or "busy" (another worker
+    is running it and its heartbeat is fresh).
+    """
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        res = db.execute(
+            update(TranscriptionJob)
+            .where(
+                TranscriptionJob.job_id == job_id,
+                or_(
+                    TranscriptionJob.status == JobStatus.queued,
+                    and_(TranscriptionJob.status == JobStatus.running, _last_seen() < _stale_cutoff()),
+                ),
+            )
+            .values(
+                status=JobStatus.running,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=TranscriptionJob.attempts + 1,
+            )
+        )
+        db.commit()
+        if res.rowcount:
+            return "claimed"
+        job = db.get(TranscriptionJob, job_id)
+        if job is None:
+            return "missing"
+        if job.status in TERMINAL_STATUSES:
+            return "done"
+        return "busy"
+
+def touch_heartbeat(job_id: str) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(TranscriptionJob)
+            .where(TranscriptionJob.job_id == job_id, TranscriptionJob.status == JobStatus.running)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+
+class JobHeartbeat:
+    """Background thread bumping heartbeat_at while a job runs (`with JobHeartbeat(job_id): ...`)."""
+
+    def __init__(self, job_id: str, interval: float | None = None):
+        self.job_id = job_id
+        self.interval = interval or settings.JOB_HEARTBEAT_INTERVAL_SEC
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                touch_heartbeat(self.job_id)
+            except Exception as e:
+                print(f"[heartbeat] {self.job_id}: {e}")
+
+    def __enter__(self) -> "JobHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+def job_tmp_files(job_id: str, tmp_dir: Path | None = None) -> List[Path]:
+    tmp_dir = tmp_dir or Path(settings.TMP_DIR)
+    if not tmp_dir.exists():
+        return []
+    return [p for p in tmp_dir.iterdir() if p.is_file() and p.name.split(".", 1)[0] == job_id]
+
+def cleanup_job_files(job_id: str) -> None:
+    for p in job_tmp_files(job_id):
+        p.unlink(missing_ok=True)
+
+def find_stale_jobs(limit: int = 100) -> List[TranscriptionJob]:
+    with SessionLocal() as db:
+        return list(db.execute(
+            select(TranscriptionJob)
+            .where(TranscriptionJob.status == JobStatus.running, _last_seen() < _stale_cutoff())
+            .order_by(TranscriptionJob.started_at)
+            .limit(limit)
+        ).scalars())
+
+def release_stale_job(job_id: str, status: JobStatus, error_message: str | None = None) -> bool:
+    """
+    Move a stale running job to `status` (queued to retry, failed to give up).
+    Conditional on the heartbeat still being stale, so a worker that came back,
+    or a concurrent reaper, wins. Returns True if this call made the change.
+    """
+    fields: dict[str, Any] = {"status": status, "error_message": error_message}
+    if status in TERMINAL_STATUSES:
+        fields["finished_at"] = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        res = db.execute(
+            update(TranscriptionJob)
+            .where(
+                TranscriptionJob.job_id == job_id,
+                TranscriptionJob.status == JobStatus.running,
+                _last_seen() < _stale_cutoff(),
+            )
+            .values(**fields)
+        )
+        db.commit()
+        return bool(res.rowcount)
+
+def restore_stale_job(job_id: str, error_message: str) -> bool:
+    """
+    Undo release_stale_job(..., queued) when the requeue could not be published:
+    put the row back to running (its heartbeat is still stale) so the next
+    reaper sweep finds and retries it instead of leaving a queued row with no
+    message behind it.
+    """
+    with SessionLocal() as db:
+        res = db.execute(
+            update(TranscriptionJob)
+            .where(TranscriptionJob.job_id == job_id, TranscriptionJob.status == JobStatus.queued)
+            .values(status=JobStatus.running, error_message=error_message)
+        )
+        db.commit()
+        return bool(res.rowcount)
+
+def cleanup_orphan_tmp_files(tmp_dir: Path | None = None) -> int:
+    """
+    Delete scratch files older than TMP_ORPHAN_MAX_AGE_SEC whose job is
+    finished or unknown. Files of queued/running jobs are kept so a
+    redelivered task can resume from them. TMP_DIR is host-local, so this
+    runs on each transcription worker (see worker.tasks), not in the reaper.
+    """
+    tmp_dir = tmp_dir or Path(settings.TMP_DIR)
+    if not tmp_dir.exists():
+        return 0
+    cutoff = time.time() - settings.TMP_ORPHAN_MAX_AGE_SEC
+    old = [p for p in tmp_dir.iterdir() if p.is_file() and p.stat().st_mtime < cutoff]
+    if not old:
+        return 0
+
+    job_ids = {p.name.split(".", 1)[0] for p in old}
+    with SessionLocal() as db:
+        active = set(db.execute(
+            select(TranscriptionJob.job_id).where(
+                TranscriptionJob.job_id.in_(job_ids),
+                TranscriptionJob.status.in_([JobStatus.queued, JobStatus.running]),
+            )
+        ).scalars())
+
+    removed = 0
+    for p in old:
+        if p.name.split(".", 1)[0] not in active:
+            p.unlink(missing_ok=True)
+            removed += 1
+    return removed